@@ -1,77 +1,229 @@
 import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from tree_dir import GitignoreParser
 
 
-def search_codebase_function(query: str, file_patterns: List[str] = None, case_sensitive: bool = False, target_dir: str = None) -> List[Dict]:
-    """
-    Search for patterns across the codebase while respecting gitignore rules.
+@dataclass
+class SearchStats:
+    """検索のスループット統計"""
+    files_scanned: int = 0
+    bytes_scanned: int = 0
+    elapsed: float = 0.0
 
-    Args:
-        query: Search term or regex pattern
-        file_patterns: File types to search (defaults to all)
-        case_sensitive: Whether search should be case-sensitive
+    @property
+    def files_per_sec(self) -> float:
+        return self.files_scanned / self.elapsed if self.elapsed > 0 else 0.0
 
-    Returns:
-        List of matches with file location and context snippets
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes_scanned / (1024 * 1024) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"scanned {self.files_scanned} files "
+                f"({self.bytes_scanned / (1024 * 1024):.2f} MB) in {self.elapsed:.3f}s: "
+                f"{self.files_per_sec:.1f} files/s, {self.mb_per_sec:.2f} MB/s")
+
+
+def load_search_max_workers() -> Optional[int]:
     """
+    Read the number of search worker threads from SEARCH_MAX_WORKERS.
 
-    matches = []
-    # Load gitignore patterns to respect them during search
-    gitignore_parsers = []
+    Returns:
+        A positive int, or None (ThreadPoolExecutor's default) if unset or invalid
+    """
+    value = os.environ.get("SEARCH_MAX_WORKERS")
+    if not value:
+        return None
+    try:
+        max_workers = int(value)
+    except ValueError:
+        max_workers = 0
+    if max_workers <= 0:
+        print(
+            f"Warning: SEARCH_MAX_WORKERS={value!r} is not a positive integer, using the default")
+        return None
+    return max_workers
 
-    gitignore_path = target_dir / ".gitignore"
-    if gitignore_path.exists():
-        # .gitignoreが存在する場合、パースしてフィルタリング
-        gitignore_parsers.append(GitignoreParser(str(gitignore_path)))
 
-    # subpath対象となるgitignoreのみを取得
-    refernce_gitignore_parsers = []
-    for parser in gitignore_parsers:
-        if parser.is_subpath(target_dir):
-            refernce_gitignore_parsers.append(parser)
+def _scan_file(item: str, query: str, case_sensitive: bool) -> Optional[Tuple[List[Dict], int]]:
+    """ファイルを検索し、マッチした行と読み込んだバイト数を返す（読み込みに失敗した場合はNone）
 
+    case_sensitiveがFalseの場合、queryは小文字化済みであること
+    """
     try:
-        items = sorted(target_dir.iterdir())
-        filtered_items = []
+        with open(item, 'rb') as f:
+            data = f.read()
+    except Exception as e:
+        print(f"Error while reading {item}: {e}")
+        return None
 
-        # ignoreされていないアイテムだけをフィルタリング
-        for item in items:
-            if not any(parser(item) for parser in refernce_gitignore_parsers):
-                filtered_items.append(item)
+    content = data.decode('utf-8', errors='ignore')
+    if query not in (content if case_sensitive else content.lower()):
+        return [], len(data)
 
-        items_count = len(filtered_items)
+    # マッチした場合、その行と前後の行を取得
+    matches = []
+    lines = content.splitlines()
+    for i, line in enumerate(lines):
+        if query in (line if case_sensitive else line.lower()):
+            start = max(0, i - 2)
+            end = min(len(lines), i + 3)
+            matches.append({
+                'file_path': item,
+                'line_number': i + 1,
+                'context': "\n".join(lines[start:end]),
+            })
+    return matches, len(data)
 
-        for i, item in enumerate(filtered_items):
-            # ファイルの場合
-            if item.is_file():
-                # 拡張子が指定されている場合、フィルタリング
-                if file_patterns and not any(item.name.endswith(pattern) for pattern in file_patterns):
-                    continue
 
-                with open(item, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    if (case_sensitive and query in content) or (not case_sensitive and query.lower() in content.lower()):
-                      # マッチした場合、その行と前後の行を取得
-                        lines = content.splitlines()
-                        for i, line in enumerate(lines):
-                            if (case_sensitive and query in line) or (not case_sensitive and query.lower() in line.lower()):
-                                start = max(0, i - 2)
-                                end = min(len(lines), i + 3)
-                                context = "\n".join(lines[start:end])
-                                matches.append({
-                                    'file_path': str(item),
-                                    'line_number': i + 1,
-                                    'context': context,
-                                })
-            # ディレクトリの場合
-            elif item.is_dir():
-                # 再帰的に検索
-                sub_matches = search_codebase_function(
-                    query, file_patterns, case_sensitive, item)
-                matches.extend(sub_matches)
+@dataclass
+class _DirectoryResult:
+    """1ディレクトリ分の検索結果"""
+    file_matches: List[Tuple[List[str], List[Dict]]]
+    subdirs: List[str]
+    gitignore_parsers: List[GitignoreParser]
+    files_scanned: int = 0
+    bytes_scanned: int = 0
+
+
+def _scan_directory(
+        target_dir: str,
+        gitignore_parsers: List[GitignoreParser],
+        file_patterns: Optional[List[str]],
+        query: str,
+        case_sensitive: bool) -> _DirectoryResult:
+    """ディレクトリを1階層だけ走査してファイルを検索し、サブディレクトリを返す"""
+    # .gitignoreが存在する場合、パースしてフィルタリング
+    # （パースに失敗した場合は親の.gitignoreだけで検索を続ける）
+    try:
+        if os.path.isfile(os.path.join(target_dir, ".gitignore")):
+            gitignore_parsers = gitignore_parsers + \
+                [GitignoreParser(target_dir)]
+    except Exception as e:
+        print(f"Error while parsing .gitignore in {target_dir}: {e}")
+
+    result = _DirectoryResult([], [], gitignore_parsers)
+    try:
+        with os.scandir(target_dir) as entries:
+            for entry in entries:
+                item = entry.path
+                # ignoreされているアイテムはスキップ
+                if gitignore_parsers and any(parser(Path(item)) for parser in gitignore_parsers):
+                    continue
+                # ファイルの場合
+                if entry.is_file():
+                    # 拡張子が指定されている場合、フィルタリング
+                    if file_patterns and not any(entry.name.endswith(pattern) for pattern in file_patterns):
+                        continue
+                    scanned = _scan_file(item, query, case_sensitive)
+                    # 読み込めなかったファイルは統計に含めない
+                    if scanned is None:
+                        continue
+                    matches, size = scanned
+                    result.files_scanned += 1
+                    result.bytes_scanned += size
+                    if matches:
+                        result.file_matches.append(
+                            (item.split(os.sep), matches))
+                # ディレクトリの場合（シンボリックリンクのループを避けるため辿らない）
+                elif entry.is_dir(follow_symlinks=False):
+                    result.subdirs.append(item)
     except Exception as e:
+        # 壊れたディレクトリはスキップして検索を続ける
         print(f"Error while searching in {target_dir}: {e}")
-        return matches
+    return result
+
+
+def search_codebase_with_stats(
+        query: str,
+        file_patterns: List[str] = None,
+        case_sensitive: bool = False,
+        target_dir: str = None,
+        gitignore_parsers: List[GitignoreParser] = None,
+        max_workers: int = None) -> Tuple[List[Dict], SearchStats]:
+    """
+    Search for a substring across the codebase and report throughput.
+
+    Each directory is one task on a thread pool: the task lists the directory
+    with os.scandir, searches its files and returns its subdirectories, which
+    are submitted as new tasks.
+
+    Args:
+        query: Search term (plain substring)
+        file_patterns: File suffixes to search (defaults to all)
+        case_sensitive: Whether search should be case-sensitive
+        target_dir: Directory to search
+        gitignore_parsers: Parsers for .gitignore files above target_dir
+        max_workers: Number of worker threads (defaults to ThreadPoolExecutor's default)
+
+    Returns:
+        Tuple of matches sorted by file path and line number, and SearchStats
+    """
+    target_path = Path(target_dir)
+    # subpath対象となるgitignoreのみを取得
+    reference_gitignore_parsers = [
+        parser for parser in (gitignore_parsers or [])
+        if parser.is_subpath(target_path)
+    ]
+    if not case_sensitive:
+        query = query.lower()
+    worker_count = max_workers or min(32, (os.process_cpu_count() or 1) + 4)
+
+    file_matches = []
+    stats = SearchStats()
+    start_time = time.perf_counter()
+    # 完了したタスクを受け取るキュー（wait()で全futureを走査しないため）
+    completed = queue.SimpleQueue()
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        def submit(directory: str, parsers: List[GitignoreParser]) -> None:
+            future = executor.submit(
+                _scan_directory, directory, parsers, file_patterns, query, case_sensitive)
+            future.add_done_callback(completed.put)
+
+        submit(str(target_path), reference_gitignore_parsers)
+        outstanding = 1
+        while outstanding:
+            result = completed.get().result()
+            outstanding -= 1
+            for subdir in result.subdirs:
+                submit(subdir, result.gitignore_parsers)
+                outstanding += 1
+            file_matches.extend(result.file_matches)
+            stats.files_scanned += result.files_scanned
+            stats.bytes_scanned += result.bytes_scanned
+
+    # 並列実行でも結果の順序が一定になるようにパスの要素ごとにファイル単位でソート
+    # （ファイル内のマッチは行番号順に並んでいる）
+    file_matches.sort(key=lambda file_match: file_match[0])
+    matches = [match for _, item_matches in file_matches for match in item_matches]
+    stats.elapsed = time.perf_counter() - start_time
+    return matches, stats
+
+
+def search_codebase_function(
+        query: str,
+        file_patterns: List[str] = None,
+        case_sensitive: bool = False,
+        target_dir: str = None,
+        max_workers: int = None) -> List[Dict]:
+    """
+    Search for patterns across the codebase while respecting gitignore rules.
+
+    Args:
+        query: Search term (plain substring)
+        file_patterns: File types to search (defaults to all)
+        case_sensitive: Whether search should be case-sensitive
+        target_dir: Directory to search
+        max_workers: Number of worker threads
+
+    Returns:
+        List of matches with file location and context snippets
+    """
+    matches, _ = search_codebase_with_stats(
+        query, file_patterns, case_sensitive, target_dir, max_workers=max_workers)
     return matches
@@ -6,9 +6,10 @@ import uvicorn
 
 from read_file import read_single_file_contents
 from tree_dir import get_tree_structure, load_base_gitignore
-from search import search_codebase_function
+from search import search_codebase_with_stats, load_search_max_workers
 
 PROJECT_NAME = os.environ.get("PROJECT_NAME", "Code Planer MCP Server")
+SEARCH_MAX_WORKERS = load_search_max_workers()
 
 # Initialize the MCP server
 mcp = FastMCP(
@@ -80,7 +81,7 @@ def search_codebase(query: str, file_patterns: List[str] = None, case_sensitive:
     Search for patterns across the codebase.
 
     Args:
-        query: Search term or regex pattern
+        query: Search term (plain substring, not a regex)
         file_patterns: File types to search (defaults to all)
         case_sensitive: Whether search should be case-sensitive
 
@@ -88,12 +89,14 @@ def search_codebase(query: str, file_patterns: List[str] = None, case_sensitive:
         List of matches with file location and context
     """
     code_root = os.path.join("/", PROJECT_NAME)
-    matches = search_codebase_function(
+    matches, stats = search_codebase_with_stats(
         query=query,
         file_patterns=file_patterns,
         case_sensitive=case_sensitive,
-        code_root=code_root
+        target_dir=code_root,
+        max_workers=SEARCH_MAX_WORKERS
     )
+    print(f"search_codebase({query!r}): {stats}")
     return matches
 
 
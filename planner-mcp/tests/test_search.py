@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from search import search_codebase_function, search_codebase_with_stats, load_search_max_workers
+
+
+@pytest.fixture
+def code_root(tmp_path):
+    """検索対象のサンプルツリーを作成する"""
+    (tmp_path / ".gitignore").write_text("build/\n")
+    for i in range(20):
+        package = tmp_path / f"pkg{i:02d}"
+        package.mkdir()
+        (package / "module.py").write_text(
+            "import os\nTARGET = 1\n\ndef f():\n    return TARGET\n")
+        (package / "notes.txt").write_text("target in text\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "generated.py").write_text("TARGET = 2\n")
+
+    nested = tmp_path / "nested"
+    nested.mkdir()
+    (nested / ".gitignore").write_text("*.log\n")
+    (nested / "kept.py").write_text("TARGET = 3\n")
+    (nested / "debug.log").write_text("TARGET = 4\n")
+    return tmp_path
+
+
+def test_same_sorted_output_for_any_worker_count(code_root):
+    single = search_codebase_function("target", target_dir=code_root, max_workers=1)
+    parallel = search_codebase_function("target", target_dir=code_root, max_workers=8)
+    assert single == parallel
+    keys = [(match['file_path'], match['line_number']) for match in single]
+    assert keys == sorted(keys)
+    assert len(single) == 20 * 3 + 1
+
+
+def test_case_sensitive_and_file_patterns(code_root):
+    matches = search_codebase_function(
+        "TARGET", file_patterns=[".py"], case_sensitive=True, target_dir=code_root)
+    assert all(match['file_path'].endswith(".py") for match in matches)
+    assert len(matches) == 20 * 2 + 1
+
+
+def test_gitignore_filtering(code_root):
+    paths = {match['file_path']
+             for match in search_codebase_function("TARGET", target_dir=code_root)}
+    assert str(code_root / "nested" / "kept.py") in paths
+    assert str(code_root / "nested" / "debug.log") not in paths
+    assert str(code_root / "build" / "generated.py") not in paths
+
+
+def test_symlink_loop_terminates(code_root):
+    os.symlink(code_root, code_root / "nested" / "loop")
+    matches = search_codebase_function("TARGET", target_dir=code_root)
+    loop = str(code_root / "nested" / "loop")
+    assert all(not match['file_path'].startswith(loop) for match in matches)
+
+
+def test_undecodable_gitignore_keeps_scanning_subtree(code_root):
+    broken = code_root / "broken"
+    broken.mkdir()
+    (broken / ".gitignore").write_bytes(b"\xff\xfe\xfa\n")
+    (broken / "kept.py").write_text("TARGET = 5\n")
+    (broken / "debug.log").write_text("TARGET = 6\n")
+    matches, stats = search_codebase_with_stats("TARGET", target_dir=code_root)
+    paths = {match['file_path'] for match in matches}
+    assert str(broken / "kept.py") in paths
+    assert str(code_root / "nested" / "kept.py") in paths
+    # 親の.gitignoreは引き続き適用される
+    assert str(code_root / "build" / "generated.py") not in paths
+    # .py, .txt, 2つのkept.py, debug.log, 3つの.gitignore
+    assert stats.files_scanned == 20 * 2 + 2 + 1 + 3
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    ("abc", None),
+    ("0", None),
+    ("-2", None),
+    ("4", 4),
+])
+def test_load_search_max_workers(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("SEARCH_MAX_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("SEARCH_MAX_WORKERS", value)
+    assert load_search_max_workers() == expected